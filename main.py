@@ -4,8 +4,9 @@ Polite breadth‑first crawler for https://utc.edu (or any single‑domain site)
 --------------------------------------------------------------------------
 Features
 ========
+* **Concurrent fetching** – pages are downloaded with `aiohttp`, several at a time (request starts spaced by a shared throttle), and parsed in a process pool across all cores.
 * **Resume reliably** – the frontier (remaining queue) is saved to `crawl_data/frontier.json` every 50 new pages and on graceful exit.
-* **Duplicate logic fixed** – URLs are only marked *visited* after a successful download; content hash de‑duplication avoids re‑saving identical documents.
+* **Duplicate logic fixed** – URLs are only recorded in the mapping after a successful download (failures are retried on the next run); content hash de‑duplication avoids re‑saving identical documents.
 * **MAX_PAGES** – set via `MAX_PAGES` env. `0` (or unset) means unlimited.
 * **Rich metadata** – title, h1, meta‑description, crawl timestamp, HTTP headers, outbound links, asset links, clean text, content hash.
 * **Config via env / .env** – no CLI flags needed.
@@ -17,38 +18,74 @@ USER_AGENT="utc-crawler/1.0"
 MAX_PAGES=100          # 0 = unlimited
 SEED_URL="https://utc.edu"
 DOMAIN="utc.edu"      # canonical domain to stay inside
-RATE_LIMIT_SECONDS=1   # polite delay between requests
+RATE_LIMIT_SECONDS=1   # polite delay between requests (per worker, on average)
+MAX_CONCURRENCY=4      # pages fetched in parallel
 TIMEOUT=10             # HTTP timeout
+WARC_ARCHIVE=false     # true = raw HTML in crawl_data/pages.warc.gz, not pages/*.html
+GZIP_HTML=false        # true = pages/*.html.gz (gzip level 1) instead of pages/*.html
 ```
 """
 
 from __future__ import annotations
 
+import asyncio
+import binascii
+import codecs
+import gzip
 import hashlib
-import json
+import multiprocessing
 import os
+import queue
 import re
+import threading
 import time
+import uuid
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Deque, Dict, Set
-from urllib.parse import (parse_qsl, urlencode, urljoin, urlparse,
-                          urlunparse)
+from functools import lru_cache
+from typing import BinaryIO, Deque, Dict, List, Mapping, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-import requests
-from bs4 import BeautifulSoup, Comment
-from bs4.exceptions import ParserRejectedMarkup
+import aiohttp
+import lxml.html
+import orjson
 from dotenv import load_dotenv
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from lxml import etree
+
+# Transient HTTP statuses worth retrying with back‑off
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Links that point at static files rather than pages
+ASSET_EXTENSIONS = frozenset(
+    {"jpg", "jpeg", "png", "gif", "css", "js", "svg", "pdf", "zip", "rar", "ico"}
+)
+# Extension at the end of the path, optionally followed by a query/fragment
+# (``logo.png?v=3`` is still an asset)
+_ASSET_RE = re.compile(
+    r"\.(?:%s)(?:$|[?#])" % "|".join(sorted(ASSET_EXTENSIONS)), re.IGNORECASE
+)
+
+# A mapping.jsonl line exactly as Crawler writes it: url first (no escapes),
+# content_hash last – compact (orjson) or with json.dumps' spaces, as older
+# runs wrote it. Anything else falls back to a full JSON parse.
+_MAPPING_LINE_RE = re.compile(
+    rb'\{"url": ?"([^"\\]+)", ?.*"content_hash": ?"([0-9a-f]{64})"\}\r?\n?\Z'
+)
 
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
-def canonicalise_url(url: str) -> str:
-    """Return a canonicalised version of *url* suitable for de‑duplication."""
-    parsed = urlparse(url)
+_MULTI_SLASH = re.compile(r"/+")
+
+
+# Shared nav/footer links recur on every page, so most calls are cache hits
+@lru_cache(maxsize=200_000)
+def canonicalise_and_parse(url: str) -> Tuple[str, str, str]:
+    """Return ``(canonical_url, scheme, netloc)`` for *url* in one parse."""
+    # urlsplit() skips urlparse()'s ;params handling – done by hand below
+    parsed = urlsplit(url)
     scheme = parsed.scheme.lower()
     netloc = parsed.netloc.lower()
     # Strip default ports
@@ -56,28 +93,213 @@ def canonicalise_url(url: str) -> str:
         scheme == "https" and netloc.endswith(":443")
     ):
         netloc = netloc.rsplit(":", 1)[0]
+    # Drop ;params from the last path segment, exactly as before
+    path = parsed.path
+    semi = path.find(";", max(path.rfind("/"), 0))
+    if semi >= 0:
+        path = path[:semi]
     # Normalise path (collapse multiple slashes, remove trailing except root)
-    path = re.sub(r"/+", "/", parsed.path)
+    path = _MULTI_SLASH.sub("/", path)
     if len(path) > 1:
         path = path.rstrip("/")
-    # Sort query params for stable ordering
-    qs = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)), doseq=True)
-    return urlunparse((scheme, netloc, path, "", qs, ""))
+    # Sort query params for stable ordering (most links have none)
+    qs = ""
+    if parsed.query:
+        qs = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)), doseq=True)
+    return urlunsplit((scheme, netloc, path, qs, "")), scheme, netloc
 
 
-def clean_text(html: str) -> str:
-    """Remove boilerplate & return plain text suitable for embedding."""
-    soup = BeautifulSoup(html, "html.parser")
-    for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "aside"]):
-        tag.decompose()
-    for comment in soup.find_all(string=lambda s: isinstance(s, Comment)):
-        comment.extract()
-    text = soup.get_text(" ", strip=True)
-    return re.sub(r"\s+", " ", text)
-
+def canonicalise_url(url: str) -> str:
+    """Return a canonicalised version of *url* suitable for de‑duplication."""
+    return canonicalise_and_parse(url)[0]
+
+
+# Elements whose content never belongs in the embedded text
+BOILERPLATE_TAGS = ("script", "style", "noscript", "header", "footer", "nav", "aside")
+
+# A <meta charset> / http-equiv declaration inside the HTML prescan window
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset", re.IGNORECASE)
+
+# Undeclared pages: byte-order marks libxml2 sniffs, how much of the body is
+# checked for valid UTF-8, and the bytes Windows-1252 leaves unassigned
+_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+_SNIFF_BYTES = 1 << 16
+_CP1252_UNDEFINED_RE = re.compile(rb"[\x81\x8d\x8f\x90\x9d]")
+
+
+@lru_cache(maxsize=None)
+def _html_parser(encoding: Optional[str]) -> lxml.html.HTMLParser:
+    try:
+        return lxml.html.HTMLParser(encoding=encoding)
+    except LookupError:  # unknown charset name – let lxml sniff instead
+        return lxml.html.HTMLParser()
+
+
+def _undeclared_charset(body: bytes) -> Optional[str]:
+    """Encoding for a *body* that declares none (``None`` = let libxml2 sniff)."""
+    if body.startswith(_BOMS):
+        return None  # libxml2 reads the BOM itself and drops it from the text
+    if body.isascii():  # C-level scan, no decode needed
+        return "utf-8"
+    try:
+        # A bounded prefix is enough to tell UTF-8 from a legacy encoding;
+        # final=False tolerates a multi-byte character cut off at the end
+        codecs.getincrementaldecoder("utf-8")().decode(body[:_SNIFF_BYTES], final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if _CP1252_UNDEFINED_RE.search(body) is None:
+        return "cp1252"
+    return "iso-8859-1"  # cp1252 leaves 5 bytes undefined; latin-1 takes anything
+
+
+def parse_html(body: bytes, charset: Optional[str]) -> lxml.html.HtmlElement:
+    """Parse the raw response *body*; decoding happens inside libxml2.
+
+    The HTTP charset wins; otherwise a ``<meta charset>`` in the first KiB is
+    left for lxml to sniff, as is a byte-order mark. Pages declaring nothing
+    are read as UTF‑8 when their first 64 KiB decode as such, else as
+    Windows‑1252 like browsers do.
+    """
+    if charset is None and not _META_CHARSET_RE.search(body, 0, 1024):
+        charset = _undeclared_charset(body)
+    return lxml.html.document_fromstring(body, parser=_html_parser(charset))
+
+
+def clean_text(tree: lxml.html.HtmlElement) -> str:
+    """Remove boilerplate from *tree* (in place) & return plain text suitable for embedding."""
+    for el in tree.iter(*BOILERPLATE_TAGS):
+        # lxml glues a removed element's tail onto the preceding text, so keep
+        # a word break there ("Hello<script>…</script>world" -> "Hello world")
+        el.tail = " " + el.tail if el.tail else " "
+    # Then remove them all in one C-level pass; with_tail=False leaves the
+    # padded tails behind
+    etree.strip_elements(tree, *BOILERPLATE_TAGS, with_tail=False)
+    # itertext() skips comments, so they need no separate pass; split() + join
+    # collapses whitespace in C – same output as stripping nodes + a regex sub
+    return " ".join(" ".join(tree.itertext()).split())
+
+
+def sha256(text: str) -> bytes:
+    """Raw SHA‑256 digest of *text*; ``.hex()`` it for file names and records."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def parse_page(
+    body: bytes, charset: Optional[str], url: str
+) -> Tuple[str, str, str, List[Tuple[str, bool]], str, bytes]:
+    """Parse, clean & hash one page; runs in a worker process.
+
+    Returns ``(title, h1, meta_description, links, text, digest)`` where
+    *links* holds ``(absolute_url, is_anchor)`` pairs in document order: every
+    ``<a href>`` plus embedded ``src``/``href`` resources that look like assets.
+    """
+    # Parse once with lxml directly (no BeautifulSoup wrapper) and take
+    # everything we need before clean_text() strips nav/header/footer
+    try:
+        tree = parse_html(body, charset)
+    except etree.LxmlError as exc:
+        # lxml errors carry an unpicklable error log – send back just the message
+        raise ValueError(f"{type(exc).__name__}: {exc}") from None
+    title_el = tree.find(".//title")
+    title = (title_el.text or "").strip() if title_el is not None else ""
+    h1_el = tree.find(".//h1")
+    h1 = "".join(s.strip() for s in h1_el.itertext()) if h1_el is not None else ""
+    meta_content = tree.xpath('//meta[@name="description"]/@content')
+    meta_description = meta_content[0].strip() if meta_content else ""
+    # Resolve every link against <base href> and then the page URL; links
+    # urljoin rejects (e.g. invalid IPv6) are dropped. Two calls because
+    # resolve_base_href=True does not pass handle_failures on
+    tree.resolve_base_href(handle_failures="discard")
+    tree.make_links_absolute(url, resolve_base_href=False, handle_failures="discard")
+    links: List[Tuple[str, bool]] = []
+    # iterlinks() walks every link-bearing attribute, so <img src>, <link href>
+    # and <script src> are picked up for asset tracking in the same pass
+    for el, attr, link, _ in tree.iterlinks():
+        if el.tag == "a" and attr == "href":
+            links.append((link, True))
+        elif attr in ("src", "href") and _ASSET_RE.search(link):
+            links.append((link, False))
+
+    text = clean_text(tree)
+    return title, h1, meta_description, links, text, sha256(text)
+
+
+def warc_record(url: str, content_type: Optional[str], body: bytes) -> bytes:
+    """Build a WARC/1.1 ``resource`` record for *body* (already content-decoded)."""
+    header = (
+        "WARC/1.1\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"Content-Type: {content_type or 'text/html'}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    ).encode("utf-8")
+    return b"".join((header, body, b"\r\n\r\n"))
+
+
+class Throttle:
+    """Token bucket of size one: request starts are spaced *interval* seconds apart.
+
+    Unlike a fixed sleep before every request, time already spent waiting on a
+    slow response counts towards the gap, so slow pages cost no extra delay.
+    The gap also adapts: when over 10% of the last minute's responses were
+    429/5xx it doubles, and it halves back towards *interval* once the
+    server has recovered (at most one change per minute either way).
+    """
+
+    WINDOW = 60.0  # seconds of responses considered
+    ERROR_SHARE = 0.1  # error share that triggers a slow-down
+    MIN_SAMPLES = 20  # don't judge the server on a handful of responses
+    MIN_BACKOFF = 0.25  # first backed-off gap when requests aren't spaced at all
+
+    def __init__(self, interval: float) -> None:
+        self.base_interval = interval
+        self.interval = interval
+        self._next = 0.0  # monotonic time the next request may start
+        self._recent: Deque[Tuple[float, bool]] = deque()  # (time, was error)
+        self._recent_errors = 0
+        self._adjusted = float("-inf")  # when interval last changed
+
+    async def __aenter__(self) -> None:
+        now = time.monotonic()
+        delay = self._next - now
+        self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    def record(self, status: int) -> None:
+        """Note a response *status*, slowing down or speeding back up if due."""
+        now = time.monotonic()
+        is_error = status == 429 or status >= 500
+        self._recent.append((now, is_error))
+        self._recent_errors += is_error
+        while self._recent[0][0] < now - self.WINDOW:
+            self._recent_errors -= self._recent.popleft()[1]
+
+        if now - self._adjusted < self.WINDOW or len(self._recent) < self.MIN_SAMPLES:
+            return
+        if self._recent_errors > self.ERROR_SHARE * len(self._recent):
+            self.interval = max(self.interval * 2, self.MIN_BACKOFF)
+            # The next request – typically the retry of this one – already
+            # waits the new gap rather than the one booked before it
+            self._next = max(self._next, now + self.interval)
+        elif self.interval > self.base_interval:
+            halved = self.interval / 2
+            # Once below the back-off floor, return to the configured pace
+            floor = max(self.MIN_BACKOFF, self.base_interval)
+            self.interval = halved if halved >= floor else self.base_interval
+        else:
+            return
+        self._adjusted = now
+        share = f"{self._recent_errors}/{len(self._recent)}"
+        print(f"Throttle – {share} recent responses were 429/5xx; now {self.interval:.2f}s apart")
 
-def sha256(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 # ---------------------------------------------------------------------------
 # Crawler class
@@ -94,6 +316,13 @@ class Crawler:
         self.max_pages = int(os.getenv("MAX_PAGES", "0")) or None  # None == unlimited
         self.rate_limit = float(os.getenv("RATE_LIMIT_SECONDS", "1"))
         self.timeout = float(os.getenv("TIMEOUT", "10"))
+        self.concurrency = max(1, int(os.getenv("MAX_CONCURRENCY", "4")))
+        self.max_retries = 3
+        self.backoff_factor = 1.0
+        # Pack raw HTML into one gzipped WARC file instead of one file per page
+        self.warc_archive = os.getenv("WARC_ARCHIVE", "false").lower() in ("1", "true", "yes")
+        # Store pages/<hash>.html.gz (gzip level 1) instead of plain .html
+        self.gzip_html = os.getenv("GZIP_HTML", "false").lower() in ("1", "true", "yes")
 
         # Paths
         self.base_dir = "crawl_data"
@@ -101,17 +330,56 @@ class Crawler:
         self.mapping_file = os.path.join(self.base_dir, "mapping.jsonl")
         self.error_file = os.path.join(self.base_dir, "errors.jsonl")
         self.frontier_file = os.path.join(self.base_dir, "frontier.json")
+        self.counts_file = os.path.join(self.base_dir, "counts.json")
+        self.warc_file = os.path.join(self.base_dir, "pages.warc.gz")
+        # Per-page paths are built with f-strings from these precomputed prefixes
+        self._pages_prefix = self.pages_dir + os.sep
+        self._html_suffix = ".html.gz" if self.gzip_html else ".html"
+        self._pages_rel_prefix = "pages" + os.sep
 
         os.makedirs(self.pages_dir, exist_ok=True)
-        for p in (self.mapping_file, self.error_file):
-            if not os.path.exists(p):
-                open(p, "w").close()
+        # Logs stay open (buffered) for the whole crawl – flushed at each
+        # checkpoint and closed on exit instead of reopened per record
+        self._mapping_fh = open(self.mapping_file, "ab", buffering=1 << 16)
+        self._error_fh = open(self.error_file, "ab", buffering=1 << 16)
+        # Running total for the summary – counted once here, then kept in memory
+        self._errors = self._count_logged_errors()
+        # One gzip member per record, so any page can be read back from its
+        # (offset, length) alone; the lock orders writes from the I/O pool
+        self._warc_fh: Optional[BinaryIO] = None
+        self._warc_lock = threading.Lock()
+        if self.warc_archive:
+            self._warc_fh = open(self.warc_file, "ab", buffering=1 << 16)
 
         # State
-        self.visited: Set[str] = set()
-        self.queued: Set[str] = set()  # URLs currently in queue
+        # Every URL ever queued, in flight or downloaded - one membership check.
+        # Stored as 64-bit fingerprints (hash() of the canonical URL), so
+        # visited URL strings don't stay alive; the queue still holds strings
+        self.seen_urls: Set[int] = set()
         self.queue: Deque[str] = deque()
-        self.seen_hashes: Set[str] = set()
+        self.in_flight: Set[str] = set()  # URLs popped but not yet processed
+        # Set whenever a page finishes; created in crawl(), as on Python < 3.10
+        # an Event binds to the loop current at construction
+        self._wakeup: asyncio.Event
+        # Same ceiling as every worker pausing RATE_LIMIT_SECONDS per request:
+        # at most MAX_CONCURRENCY requests per RATE_LIMIT_SECONDS overall
+        self._throttle = Throttle(self.rate_limit / self.concurrency)
+        # Page files are written off the event loop so disk I/O overlaps fetches
+        self._io_pool = ThreadPoolExecutor(max_workers=4)
+        # Parsing/cleaning/hashing is CPU-bound – spread it over every core.
+        # "spawn" because the checkpoint and I/O threads must not be forked
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+        )
+        # Periodic checkpoints are serialised and written by a background
+        # thread; only the newest unwritten snapshot is kept (None = stop)
+        self._ckpt_queue: "queue.Queue[Optional[Tuple[List[str], Dict]]]" = queue.Queue(maxsize=1)
+        self._ckpt_thread = threading.Thread(target=self._ckpt_worker, daemon=True)
+        # Raw 32-byte digests: about half the memory of 64-char hex strings
+        self.seen_hashes: Set[bytes] = set()
+        # One directory listing up front instead of a stat() per saved page
+        with os.scandir(self.pages_dir) as it:
+            self.existing_pages: Set[str] = {entry.name for entry in it}
         self.downloaded = 0
 
         self._load_previous_state()
@@ -119,19 +387,6 @@ class Crawler:
         if not self.queue:
             self._enqueue(self.seed_url)
 
-        # HTTP session with retries
-        self.session = requests.Session()
-        retries = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET"],
-        )
-        adapter = HTTPAdapter(max_retries=retries)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        self.session.headers.update({"User-Agent": self.user_agent})
-
     # ---------------------------------------------------------------------
     # Persistence helpers
     # ---------------------------------------------------------------------
@@ -140,37 +395,140 @@ class Crawler:
         """Populate visited URLs and content hashes from previous runs."""
         if not os.path.exists(self.mapping_file):
             return
-        with open(self.mapping_file, "r", encoding="utf-8") as mf:
+        with open(self.mapping_file, "rb", buffering=1 << 20) as mf:
             for line in mf:
+                # Fast path: pull the two fields out of the raw bytes, no dict built
+                m = _MAPPING_LINE_RE.match(line)
+                if m:
+                    self.seen_urls.add(hash(m[1].decode("utf-8")))
+                    self.seen_hashes.add(binascii.unhexlify(m[2]))
+                    continue
                 try:
-                    rec = json.loads(line)
+                    rec = orjson.loads(line)
                     if rec.get("url"):
-                        self.visited.add(rec["url"])
+                        self.seen_urls.add(hash(rec["url"]))
                     if rec.get("content_hash"):
-                        self.seen_hashes.add(rec["content_hash"])
-                except json.JSONDecodeError:
+                        self.seen_hashes.add(bytes.fromhex(rec["content_hash"]))
+                except ValueError:  # includes orjson.JSONDecodeError
                     continue
 
     def _load_frontier(self) -> None:
         if not os.path.exists(self.frontier_file):
             return
         try:
-            with open(self.frontier_file, "r", encoding="utf-8") as f:
-                frontier = json.load(f)
+            with open(self.frontier_file, "rb") as f:
+                frontier = orjson.loads(f.read())
             for url in frontier:
                 self._enqueue(url)
         except Exception:
             # Corrupt frontier – start from scratch next run
             pass
 
+    def _frontier_snapshot(self) -> List[str]:
+        # In-flight URLs go first so an interrupted batch is retried on resume
+        return [*self.in_flight, *self.queue]
+
+    def _counts(self, frontier_size: int) -> Dict:
+        """Progress figures for ``counts.json`` – read these instead of parsing the frontier."""
+        return {
+            "frontier_size": frontier_size,
+            "total_pages": len(self.seen_hashes),  # unique pages, all runs
+            "downloaded": self.downloaded,  # this run
+            "errors": self._errors,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _write_atomic(self, path: str, data: bytes, fsync: bool = True) -> None:
+        # Write to a temp file and rename over the old file, so a crash
+        # mid-write never leaves a truncated file behind. The fsync makes
+        # sure the data is on disk before the rename can be (checkpoints only;
+        # page files skip it and are merely crash-safe, not power-loss-safe).
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _write_checkpoint(self, frontier: List[str], counts: Dict) -> None:
+        self._write_atomic(self.frontier_file, orjson.dumps(frontier))
+        self._write_atomic(self.counts_file, orjson.dumps(counts))
+
     def _save_frontier(self) -> None:
-        with open(self.frontier_file, "w", encoding="utf-8") as f:
-            json.dump(list(self.queue), f)
+        frontier = self._frontier_snapshot()
+        self._write_checkpoint(frontier, self._counts(len(frontier)))
 
-    def _append_jsonl(self, path: str, obj: Dict) -> None:
-        with open(path, "a", encoding="utf-8") as f:
-            json.dump(obj, f, ensure_ascii=False)
-            f.write("\n")
+    def _queue_checkpoint(self) -> None:
+        """Hand a frontier snapshot to the checkpoint thread, replacing a stale one."""
+        frontier = self._frontier_snapshot()
+        snapshot = (frontier, self._counts(len(frontier)))
+        try:
+            self._ckpt_queue.put_nowait(snapshot)
+        except queue.Full:
+            try:
+                self._ckpt_queue.get_nowait()  # superseded before it was written
+            except queue.Empty:
+                pass  # the writer picked it up in the meantime
+            self._ckpt_queue.put_nowait(snapshot)
+
+    def _ckpt_worker(self) -> None:
+        while True:
+            snapshot = self._ckpt_queue.get()
+            if snapshot is None:
+                return
+            try:
+                self._write_checkpoint(*snapshot)
+            except Exception as exc:  # noqa: BLE001
+                print(f"Warning: Failed to save frontier checkpoint: {exc}")
+
+    def _stop_checkpoints(self) -> None:
+        """Let the checkpoint thread finish its last write before the final save."""
+        if self._ckpt_thread.is_alive():
+            self._ckpt_queue.put(None)
+            self._ckpt_thread.join()
+
+    def _append_jsonl(self, fh: BinaryIO, obj: Dict) -> None:
+        # orjson writes UTF-8 directly (no ensure_ascii escaping) plus the newline
+        fh.write(orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE))
+
+    def _log_error(self, url: str, error: str) -> None:
+        self._append_jsonl(self._error_fh, {"url": url, "error": error})
+        self._errors += 1
+
+    def _flush_logs(self) -> None:
+        # WARC first: a mapping line must never point at archive bytes that
+        # are not durably on disk yet
+        for fh in (self._warc_fh, self._mapping_fh, self._error_fh):
+            if fh is not None:
+                fh.flush()
+                os.fsync(fh.fileno())
+
+    def _write_page(
+        self, html_path: Optional[str], body: bytes, meta_path: str, metadata: Dict
+    ) -> None:
+        """Write a page's HTML (unless already on disk) and JSON; runs on the I/O pool."""
+        if self._warc_fh is not None:
+            member = gzip.compress(
+                warc_record(metadata["url"], metadata["headers"]["content_type"], body)
+            )
+            with self._warc_lock:
+                offset = self._warc_fh.tell()
+                self._warc_fh.write(member)
+            metadata["warc_offset"] = offset
+            metadata["warc_length"] = len(member)
+        elif html_path is not None:
+            # Raw response bytes, in the server's own encoding; level 1 still
+            # shrinks HTML ~3x for next to no CPU
+            data = gzip.compress(body, compresslevel=1) if self.gzip_html else body
+            self._write_atomic(html_path, data, fsync=False)
+        self._write_atomic(meta_path, orjson.dumps(metadata), fsync=False)
+
+    def _close_logs(self) -> None:
+        self._mapping_fh.close()
+        self._error_fh.close()
+        if self._warc_fh is not None:
+            self._warc_fh.close()
 
     # ---------------------------------------------------------------------
     # Queue helpers
@@ -178,182 +536,281 @@ class Crawler:
 
     def _enqueue(self, url: str) -> None:
         canon = canonicalise_url(url)
-        if canon in self.visited or canon in self.queued:
+        fingerprint = hash(canon)
+        if fingerprint in self.seen_urls:
             return
         self.queue.append(canon)
-        self.queued.add(canon)
+        self.seen_urls.add(fingerprint)
+
+    def _enqueue_many(self, canon_urls: Dict[str, None]) -> None:
+        """Queue already-canonical URLs in order, filtering known ones by fingerprint."""
+        seen = self.seen_urls
+        # str caches its hash, so each URL is only hashed once (as a dict key)
+        new_urls = [u for u in canon_urls if hash(u) not in seen]
+        if not new_urls:
+            return
+        self.queue.extend(new_urls)
+        seen.update(map(hash, new_urls))
 
     # ---------------------------------------------------------------------
     # Error counting (for summary)
     # ---------------------------------------------------------------------
 
+    def _count_logged_errors(self) -> int:
+        """Count errors left in ``errors.jsonl`` by previous runs (startup only)."""
+        # One record per line: count newlines in 1 MiB blocks, no line splitting
+        with open(self.error_file, "rb") as f:
+            return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+
     def _error_count(self) -> int:
-        try:
-            with open(self.error_file, "r", encoding="utf-8") as f:
-                return sum(1 for _ in f if _.strip())
-        except FileNotFoundError:
-            return 0
+        return self._errors
 
     # ---------------------------------------------------------------------
-    # Main crawl loop
+    # Fetching
     # ---------------------------------------------------------------------
 
-    def crawl(self) -> None:
-        print(f"Starting crawl – max_pages={self.max_pages or '∞'} | seed={self.seed_url}")
+    async def _fetch(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> Optional[Tuple[int, Mapping[str, str], bytes, Optional[str]]]:
+        """GET *url* with retry/back‑off; return ``(status, headers, body, charset)`` or ``None``."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Every attempt waits for the shared throttle, so retries
+                # (and the back-off it applies after 429/5xx) count too
+                async with self._throttle, session.get(url) as resp:
+                    self._throttle.record(resp.status)
+                    if resp.status not in RETRY_STATUSES or attempt == self.max_retries:
+                        if resp.status != 200:
+                            self._log_error(url, f"status_code {resp.status}")
+                            return None
+                        # Raw bytes – lxml decodes them itself, no str round-trip
+                        body = await resp.read()
+                        return resp.status, resp.headers, body, resp.charset
+            except Exception as exc:  # noqa: BLE001
+                if attempt == self.max_retries:
+                    error_msg = str(exc) or type(exc).__name__
+                    # Log the error with URL for debugging
+                    self._log_error(url, error_msg)
+                    print(f"Error fetching {url}: {error_msg}")
+                    return None
+            await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+        return None
+
+    async def _bounded_fetch(
+        self, session: aiohttp.ClientSession, sem: asyncio.BoundedSemaphore, url: str
+    ) -> None:
+        """Fetch and process *url* while holding one of the concurrency slots."""
+        async with sem:
+            # Wrap entire page processing to prevent crashes
+            try:
+                fetched = await self._fetch(session, url)
+                if fetched is not None:
+                    await self._process_page(url, *fetched)
+            except Exception as exc:  # noqa: BLE001
+                # Catch-all for any unexpected errors during page processing
+                error_msg = f"Unexpected error: {type(exc).__name__} - {str(exc)[:100]}"
+                try:
+                    self._log_error(url, error_msg)
+                except Exception:  # noqa: BLE001
+                    pass  # If we can't even log, just continue
+                print(f"Unexpected error processing {url}: {type(exc).__name__}")
+            finally:
+                self.in_flight.discard(url)
+
+    # ---------------------------------------------------------------------
+    # Page processing
+    # ---------------------------------------------------------------------
+
+    async def _process_page(
+        self,
+        url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+        charset: Optional[str],
+    ) -> None:
+        # Parse HTML and extract content in the process pool, so the event
+        # loop keeps fetching while pages are being parsed
         try:
-            while self.queue:
-                if self.max_pages is not None and self.downloaded >= self.max_pages:
-                    print("Reached MAX_PAGES limit – stopping.")
-                    break
+            title, h1, meta_description, links, text, digest = (
+                await asyncio.get_running_loop().run_in_executor(
+                    self._parse_pool, parse_page, body, charset, url
+                )
+            )
+            content_hash = digest.hex()
+            is_new_doc = digest not in self.seen_hashes
+
+            # Only increase counters/save if it's genuinely new
+            if is_new_doc:
+                self.seen_hashes.add(digest)
+                self.downloaded += 1
+        except (etree.ParserError, Exception) as exc:
+            # Skip pages with malformed HTML, binary or empty content
+            error_msg = f"Parser error: {type(exc).__name__} - {str(exc)[:100]}"
+            self._log_error(url, error_msg)
+            print(f"Skipping unparseable content at {url}: {type(exc).__name__}")
+            return
+
+        # ----------------------------------------------------------------
+        # New document: pick file names & build JSON metadata
+        # ----------------------------------------------------------------
+        if is_new_doc:
+            html_name = f"{content_hash}{self._html_suffix}"
+            html_file = f"{self._pages_rel_prefix}{html_name}"
+            # Named after the cleaned-text hash: an existing file holds a page
+            # with the same text, and atomic writes mean it is never truncated
+            html_path: Optional[str] = None
+            if self.warc_archive:
+                html_file = "pages.warc.gz"  # plus warc_offset/warc_length below
+            elif html_name not in self.existing_pages:
+                html_path = f"{self._pages_prefix}{html_name}"
+                self.existing_pages.add(html_name)
+
+            meta_path = f"{self._pages_prefix}{content_hash}.json"
+            metadata: Dict = {
+                "url": url,
+                "file": html_file,
+                "crawl_ts": datetime.now(timezone.utc).isoformat(),
+                "status": status,
+                "headers": {
+                    "etag": headers.get("ETag"),
+                    "last_modified": headers.get("Last-Modified"),
+                    "content_type": headers.get("Content-Type"),
+                    "content_length": headers.get("Content-Length"),
+                },
+                "title": title,
+                "h1": h1,
+                "meta_description": meta_description,
+                "content_hash": content_hash,
+                "links": [],
+                "assets": [],
+                "text": text,
+            }
+
+        # ----------------------------------------------------------------
+        # Link & asset extraction
+        # ----------------------------------------------------------------
+        candidates: Dict[str, None] = {}  # ordered set of page links to queue
+        page_seen: Set[str] = set()  # links already handled on this page
+        for link, is_anchor in links:
+            # Nav bars & footers repeat the same links – handle each only once
+            if link in page_seen:
+                continue
+            page_seen.add(link)
+            try:
+                abs_url, scheme, netloc = canonicalise_and_parse(link)
+            except (ValueError, Exception) as exc:
+                # Skip malformed URLs (e.g., invalid IPv6)
+                print(f"Skipping malformed URL '{link}' on {url}: {exc}")
+                continue
+
+            if scheme not in ("http", "https"):
+                continue
+            if netloc != self.domain:
+                continue
+
+            if not is_anchor or _ASSET_RE.search(abs_url):
+                if is_new_doc:
+                    metadata["assets"].append(abs_url)  # type: ignore[index]
+                continue
+
+            candidates[abs_url] = None
+            if is_new_doc:
+                metadata["links"].append(abs_url)  # type: ignore[index]
+
+        self._enqueue_many(candidates)
+
+        # Persist page files, then the mapping entry that points at them
+        if is_new_doc:
+            await asyncio.get_running_loop().run_in_executor(
+                self._io_pool, self._write_page, html_path, body, meta_path, metadata
+            )
+
+            # Key order matters: _MAPPING_LINE_RE expects url first, hash last
+            entry: Dict = {"url": url, "file": html_file, "title": title}
+            if self.warc_archive:
+                entry["warc_offset"] = metadata["warc_offset"]
+                entry["warc_length"] = metadata["warc_length"]
+            entry["content_hash"] = content_hash
+            self._append_jsonl(self._mapping_fh, entry)
+
+        # Periodically checkpoint the frontier and progress
+        if self.downloaded % 50 == 0 and self.downloaded:
+            try:
+                self._flush_logs()
+                self._queue_checkpoint()
+            except Exception as exc:  # noqa: BLE001
+                print(f"Warning: Failed to save frontier checkpoint: {exc}")
+            print(f"Checkpoint – downloaded {self.downloaded} pages, queue={len(self.queue)}")
 
+    # ---------------------------------------------------------------------
+    # Workers
+    # ---------------------------------------------------------------------
+
+    def _can_schedule(self) -> bool:
+        """True if another page may start without risking overshooting MAX_PAGES."""
+        return self.max_pages is None or self.downloaded + len(self.in_flight) < self.max_pages
+
+    async def _worker(
+        self, session: aiohttp.ClientSession, sem: asyncio.BoundedSemaphore
+    ) -> None:
+        """Pull URLs off the frontier until it is drained (or MAX_PAGES is hit)."""
+        while True:
+            if self.queue and self._can_schedule():
                 url = self.queue.popleft()
-                self.queued.discard(url)
-                time.sleep(self.rate_limit)
+                self.in_flight.add(url)
+                await self._bounded_fetch(session, sem, url)
+                self._wakeup.set()
+            elif self.in_flight:
+                # Pages still being processed may queue new links (or turn
+                # out to be duplicates, freeing MAX_PAGES budget) – wait
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            else:
+                return
 
-                # Wrap entire page processing to prevent crashes
-                try:
-                    try:
-                        resp = self.session.get(url, timeout=self.timeout)
-                    except Exception as exc:  # noqa: BLE001
-                        error_msg = str(exc)
-                        # Log the error with URL for debugging
-                        self._append_jsonl(self.error_file, {"url": url, "error": error_msg})
-                        print(f"Error fetching {url}: {error_msg}")
-                        continue
-
-                    if resp.status_code != 200:
-                        self._append_jsonl(
-                            self.error_file,
-                            {"url": url, "error": f"status_code {resp.status_code}"},
-                        )
-                        continue
-
-                    html = resp.text
-
-                    # Parse HTML and extract content
-                    try:
-                        text = clean_text(html)
-                        content_hash = sha256(text)
-                        is_new_doc = content_hash not in self.seen_hashes
-
-                        # Only increase counters/save if it's genuinely new
-                        if is_new_doc:
-                            self.seen_hashes.add(content_hash)
-                            self.downloaded += 1
-
-                        soup = BeautifulSoup(html, "html.parser")
-                        title = soup.title.string.strip() if soup.title and soup.title.string else ""
-                        h1 = soup.h1.get_text(strip=True) if soup.h1 else ""
-                        meta_tag = soup.find("meta", attrs={"name": "description"})
-                        meta_description = meta_tag.get("content", "").strip() if meta_tag else ""
-                    except (ParserRejectedMarkup, Exception) as exc:
-                        # Skip pages with malformed HTML or binary content
-                        error_msg = f"Parser error: {type(exc).__name__} - {str(exc)[:100]}"
-                        self._append_jsonl(self.error_file, {"url": url, "error": error_msg})
-                        print(f"Skipping unparseable content at {url}: {type(exc).__name__}")
-                        continue
-
-                    # ----------------------------------------------------------------
-                    # Save new document (HTML + JSON metadata)
-                    # ----------------------------------------------------------------
-                    if is_new_doc:
-                        html_name = f"{content_hash}.html"
-                        html_path = os.path.join(self.pages_dir, html_name)
-                        with open(html_path, "w", encoding="utf-8") as fh:
-                            fh.write(html)
-
-                        meta_path = os.path.join(self.pages_dir, f"{content_hash}.json")
-                        metadata: Dict = {
-                            "url": url,
-                            "file": os.path.join("pages", html_name),
-                            "crawl_ts": datetime.now(timezone.utc).isoformat(),
-                            "status": resp.status_code,
-                            "headers": {
-                                "etag": resp.headers.get("ETag"),
-                                "last_modified": resp.headers.get("Last-Modified"),
-                                "content_type": resp.headers.get("Content-Type"),
-                                "content_length": resp.headers.get("Content-Length"),
-                            },
-                            "title": title,
-                            "h1": h1,
-                            "meta_description": meta_description,
-                            "content_hash": content_hash,
-                            "links": [],
-                            "assets": [],
-                            "text": text,
-                        }
-
-                    # ----------------------------------------------------------------
-                    # Link & asset extraction
-                    # ----------------------------------------------------------------
-                    for tag in soup.find_all("a", href=True):
-                        href = tag["href"].strip()
-                        try:
-                            abs_url = canonicalise_url(urljoin(url, href))
-                            parsed = urlparse(abs_url)
-                        except (ValueError, Exception) as exc:
-                            # Skip malformed URLs (e.g., invalid IPv6)
-                            print(f"Skipping malformed URL '{href}' on {url}: {exc}")
-                            continue
-
-                        if parsed.scheme not in ("http", "https"):
-                            continue
-                        if parsed.netloc != self.domain:
-                            continue
-
-                        if abs_url.lower().endswith(
-                            (".jpg", ".jpeg", ".png", ".gif", ".css", ".js", ".svg", ".pdf", ".zip", ".rar", ".ico")
-                        ):
-                            if is_new_doc:
-                                metadata["assets"].append(abs_url)  # type: ignore[index]
-                            continue
-
-                        self._enqueue(abs_url)
-                        if is_new_doc:
-                            metadata["links"].append(abs_url)  # type: ignore[index]
-
-                    # Persist mapping & per-page JSON
-                    if is_new_doc:
-                        with open(meta_path, "w", encoding="utf-8") as fm:
-                            json.dump(metadata, fm, ensure_ascii=False, indent=2)
-
-                        self._append_jsonl(
-                            self.mapping_file,
-                            {
-                                "url": url,
-                                "file": os.path.join("pages", html_name),
-                                "title": title,
-                                "content_hash": content_hash,
-                            },
-                        )
-
-                    # Mark as fully visited AFTER processing links
-                    self.visited.add(url)
-
-                    # Periodically checkpoint the frontier and progress
-                    if self.downloaded % 50 == 0 and self.downloaded:
-                        try:
-                            self._save_frontier()
-                        except Exception as exc:  # noqa: BLE001
-                            print(f"Warning: Failed to save frontier checkpoint: {exc}")
-                        print(f"Checkpoint – downloaded {self.downloaded} pages, queue={len(self.queue)}")
-
-                except Exception as exc:  # noqa: BLE001
-                    # Catch-all for any unexpected errors during page processing
-                    error_msg = f"Unexpected error: {type(exc).__name__} - {str(exc)[:100]}"
-                    try:
-                        self._append_jsonl(self.error_file, {"url": url, "error": error_msg})
-                    except Exception:  # noqa: BLE001
-                        pass  # If we can't even log, just continue
-                    print(f"Unexpected error processing {url}: {type(exc).__name__}")
-                    continue
+    # ---------------------------------------------------------------------
+    # Main crawl loop
+    # ---------------------------------------------------------------------
+
+    async def crawl(self) -> None:
+        print(f"Starting crawl – max_pages={self.max_pages or '∞'} | seed={self.seed_url}")
+        self._ckpt_thread.start()
+        self._wakeup = asyncio.Event()
+        sem = asyncio.BoundedSemaphore(self.concurrency)
+        # Everything goes to one host: keep idle sockets and the DNS answer
+        # around long enough that requests reuse them instead of reconnecting
+        connector = aiohttp.TCPConnector(
+            limit=max(20, self.concurrency),
+            limit_per_host=self.concurrency,
+            keepalive_timeout=30,
+            ttl_dns_cache=300,
+        )
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                # aiohttp already sends Accept-Encoding: gzip, deflate – plus br
+                # when Brotli is installed – and decodes bodies transparently
+                headers={"User-Agent": self.user_agent},
+            ) as session:
+                await asyncio.gather(
+                    *(self._worker(session, sem) for _ in range(self.concurrency))
+                )
+            if self.queue and not self._can_schedule():
+                print("Reached MAX_PAGES limit – stopping.")
 
         finally:
+            self._parse_pool.shutdown(wait=True)
+            self._io_pool.shutdown(wait=True)
+            self._stop_checkpoints()
             # Always persist frontier on termination
             try:
+                self._flush_logs()
                 self._save_frontier()
             except Exception as exc:  # noqa: BLE001
                 print(f"Warning: Failed to save final frontier state: {exc}")
+            self._close_logs()
             print(
                 f"Crawl complete – downloaded {self.downloaded} new unique pages. "
                 f"Errors logged: {self._error_count()}"
@@ -366,4 +823,4 @@ class Crawler:
 
 
 if __name__ == "__main__":
-    Crawler().crawl()
+    asyncio.run(Crawler().crawl())
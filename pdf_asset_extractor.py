@@ -14,13 +14,88 @@ Output:
     pdf_assets.jsonl - Contains one JSON record per PDF asset found
 """
 
-import json
+import mmap
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
+import orjson
+
+MAX_WORKERS = 16  # Page JSON files read in parallel
+MMAP_THRESHOLD = 1 << 20  # Files larger than this are parsed straight from an mmap
+
+# Case-insensitive ".pdf" suffix; matched at len(url) - 4 so the URL is
+# never copied just to lowercase it
+_PDF_SUFFIX = re.compile(r"\.pdf\Z", re.IGNORECASE)
+
+
+@lru_cache(maxsize=65536)
+def _pdf_url_fields(asset_url: str) -> Tuple[str, str, str]:
+    """Return ``(filename, path, domain)`` for a PDF URL; the same URLs recur on many pages."""
+    parsed_url = urlparse(asset_url)
+    filename = os.path.basename(parsed_url.path) or "unknown.pdf"
+    return filename, parsed_url.path, parsed_url.netloc
+
+
+def _page_pdf_records(json_file: str, extracted_at: str) -> Optional[List[Dict]]:
+    """
+    Build PDF asset records for one page JSON file; runs on a worker thread.
+    
+    Args:
+        json_file: Path to the page's JSON metadata file
+        extracted_at: ISO timestamp of this extraction run, shared by all records
+        
+    Returns:
+        List of PDF asset records (not yet de-duplicated), or None if the
+        file could not be read
+    """
+    try:
+        with open(json_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                # Parse from the page cache directly – no userspace copy
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        page_data = orjson.loads(view)
+            else:
+                page_data = orjson.loads(f.read())
+        
+        records = []
+        
+        # Extract PDF assets from the current page
+        assets = page_data.get("assets", [])
+        for asset_url in assets:
+            if _PDF_SUFFIX.match(asset_url, max(len(asset_url) - 4, 0)):
+                # Extract filename from URL
+                filename, url_path, url_domain = _pdf_url_fields(asset_url)
+                
+                # Create PDF asset record
+                pdf_record = {
+                    "pdf_url": asset_url,
+                    "filename": filename,
+                    "source_page_url": page_data.get("url", ""),
+                    "source_page_title": page_data.get("title", ""),
+                    "source_page_hash": page_data.get("content_hash", ""),
+                    "discovered_at": page_data.get("crawl_ts", ""),
+                    "extracted_at": extracted_at,
+                    "url_path": url_path,
+                    "url_domain": url_domain
+                }
+                
+                records.append(pdf_record)
+        
+        return records
+                
+    except (orjson.JSONDecodeError, FileNotFoundError, KeyError) as e:
+        print(f"Warning: Error processing {json_file}: {e}")
+        return None
+
 
 def extract_pdf_assets(pages_dir: str = "crawl_data/pages") -> List[Dict]:
     """
@@ -41,49 +116,35 @@ def extract_pdf_assets(pages_dir: str = "crawl_data/pages") -> List[Dict]:
         print(f"Error: Directory '{pages_dir}' does not exist")
         return []
     
-    # Process all JSON files in the pages directory
-    json_files = list(pages_path.glob("*.json"))
+    # Process all JSON files in the pages directory; scandir's entries carry
+    # the file type already, so this needs no stat() per file (unlike glob)
+    with os.scandir(pages_path) as it:
+        json_files = [
+            e.path for e in it
+            if e.name.endswith('.json') and e.is_file(follow_symlinks=False)
+        ]
     print(f"Processing {len(json_files)} JSON files...")
     
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                page_data = json.load(f)
+    # One timestamp for the whole run rather than a datetime per record
+    extracted_at = datetime.now(timezone.utc).isoformat()
+    
+    # Files are read on a thread pool (the reads release the GIL); results
+    # come back in file order and are de-duplicated here, so the output is
+    # the same as a sequential pass
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for records in executor.map(_page_pdf_records, json_files, repeat(extracted_at)):
+            if records is None:
+                continue
             
             processed_files += 1
             
-            # Extract PDF assets from the current page
-            assets = page_data.get("assets", [])
-            for asset_url in assets:
-                if asset_url.lower().endswith(".pdf"):
-                    # Skip if we've already seen this PDF URL
-                    if asset_url in seen_pdfs:
-                        continue
-                    
-                    seen_pdfs.add(asset_url)
-                    
-                    # Extract filename from URL
-                    parsed_url = urlparse(asset_url)
-                    filename = os.path.basename(parsed_url.path) or "unknown.pdf"
-                    
-                    # Create PDF asset record
-                    pdf_record = {
-                        "pdf_url": asset_url,
-                        "filename": filename,
-                        "source_page_url": page_data.get("url", ""),
-                        "source_page_title": page_data.get("title", ""),
-                        "source_page_hash": page_data.get("content_hash", ""),
-                        "discovered_at": page_data.get("crawl_ts", ""),
-                        "extracted_at": datetime.now(timezone.utc).isoformat(),
-                        "url_path": parsed_url.path,
-                        "url_domain": parsed_url.netloc
-                    }
-                    
-                    pdf_assets.append(pdf_record)
-                    
-        except (json.JSONDecodeError, FileNotFoundError, KeyError) as e:
-            print(f"Warning: Error processing {json_file}: {e}")
-            continue
+            for pdf_record in records:
+                # Skip if we've already seen this PDF URL
+                if pdf_record["pdf_url"] in seen_pdfs:
+                    continue
+                
+                seen_pdfs.add(pdf_record["pdf_url"])
+                pdf_assets.append(pdf_record)
     
     print(f"Processed {processed_files} JSON files")
     print(f"Found {len(pdf_assets)} unique PDF assets")
@@ -99,10 +160,15 @@ def save_to_jsonl(pdf_assets: List[Dict], output_file: str = "pdf_assets.jsonl")
         pdf_assets: List of PDF asset dictionaries
         output_file: Output filename for the JSONL file
     """
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for asset in pdf_assets:
-            json.dump(asset, f, ensure_ascii=False)
-            f.write('\n')
+    # orjson emits UTF-8 bytes with the newline included; records are joined
+    # into 64k-record batches so each batch is a single write
+    batch_size = 65536
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        for start in range(0, len(pdf_assets), batch_size):
+            f.write(b''.join(
+                orjson.dumps(asset, option=orjson.OPT_APPEND_NEWLINE)
+                for asset in pdf_assets[start:start + batch_size]
+            ))
     
     print(f"Saved {len(pdf_assets)} PDF assets to {output_file}")
 
@@ -119,16 +185,21 @@ def print_summary(pdf_assets: List[Dict]) -> None:
         domain = asset.get("url_domain", "unknown")
         domain_counts[domain] = domain_counts.get(domain, 0) + 1
     
-    print(f"\n=== PDF Assets Summary ===")
-    print(f"Total unique PDFs: {len(pdf_assets)}")
-    print(f"\nPDFs by domain:")
+    # Build the whole report and write it once instead of one print() per line
+    lines = [
+        "\n=== PDF Assets Summary ===",
+        f"Total unique PDFs: {len(pdf_assets)}",
+        "\nPDFs by domain:",
+    ]
     for domain, count in sorted(domain_counts.items(), key=lambda x: x[1], reverse=True):
-        print(f"  {domain}: {count} PDFs")
+        lines.append(f"  {domain}: {count} PDFs")
     
     # Show first few examples
-    print(f"\nFirst 5 PDFs found:")
+    lines.append("\nFirst 5 PDFs found:")
     for i, asset in enumerate(pdf_assets[:5]):
-        print(f"  {i+1}. {asset['filename']} - from {asset['source_page_title']}")
+        lines.append(f"  {i+1}. {asset['filename']} - from {asset['source_page_title']}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -0,0 +1,18 @@
+import lxml.html
+import pytest
+
+from main import clean_text
+
+
+@pytest.mark.parametrize(
+    "html, expected",
+    [
+        ("<p>Hello<script>x</script>world</p>", "Hello world"),
+        ("<p>a<nav>n</nav>b <footer>f</footer>c</p>", "a b c"),
+        ("<p>one<style>p{}</style><aside>x</aside>two</p>", "one two"),
+        ("<div>keep<nav><script>s</script>n</nav></div>", "keep"),
+        ("<p>Hel<b>lo</b> <!-- c -->there</p>", "Hel lo there"),
+    ],
+)
+def test_clean_text_keeps_word_breaks(html, expected):
+    assert clean_text(lxml.html.fromstring(html)) == expected
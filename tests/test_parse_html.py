@@ -0,0 +1,20 @@
+import codecs
+
+import pytest
+
+from main import parse_html
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        (b"<p>caf\xc3\xa9</p>", "café"),  # undeclared UTF-8
+        (b"<p>caf\xe9 \x93q\x94</p>", "café “q”"),  # undeclared cp1252
+        (b"<p>x\x81y \xe9</p>", "x\x81y é"),  # not even valid cp1252
+        (codecs.BOM_UTF8 + "<p>café</p>".encode("utf-8"), "café"),
+        (codecs.BOM_UTF16_LE + "<p>café</p>".encode("utf-16-le"), "café"),
+        (codecs.BOM_UTF16_BE + "<p>café</p>".encode("utf-16-be"), "café"),
+    ],
+)
+def test_parse_html_undeclared_charset(body, expected):
+    assert parse_html(body, None).text_content() == expected
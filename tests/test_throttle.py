@@ -0,0 +1,70 @@
+import asyncio
+
+import main
+from main import Crawler, Throttle
+
+
+class FakeClock:
+    """Stands in for time.monotonic and asyncio.sleep: sleeping advances time."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+        self.charset = None
+
+    async def read(self):
+        return b"<p>ok</p>"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class FakeSession:
+    def __init__(self, statuses, clock):
+        self.statuses = list(statuses)
+        self.clock = clock
+        self.started = []  # clock reading at each request
+
+    def get(self, url):
+        self.started.append(self.clock.now)
+        return FakeResponse(self.statuses.pop(0))
+
+
+def test_retry_after_429_waits_for_backed_off_throttle(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(main.asyncio, "sleep", clock.sleep)
+
+    throttle = Throttle(0.1)
+    # A 429 storm: one short of the samples needed before the throttle reacts
+    for _ in range(Throttle.MIN_SAMPLES - 1):
+        throttle.record(429)
+
+    crawler = Crawler.__new__(Crawler)  # only the retry loop is exercised
+    crawler._throttle = throttle
+    crawler.max_retries = 3
+    crawler.backoff_factor = 0.0  # isolate the throttle from the retry back-off
+    session = FakeSession([429, 200], clock)
+
+    fetched = asyncio.run(crawler._fetch(session, "https://example.edu/"))
+
+    assert fetched is not None and fetched[0] == 200
+    assert throttle.interval == Throttle.MIN_BACKOFF
+    # The retry went through the throttle and waited the backed-off gap
+    assert session.started[1] - session.started[0] == Throttle.MIN_BACKOFF